@@ -3,6 +3,6 @@ from .llms import LLMS
 def init(*args, **kwargs):
     if len(args) > 1 and not kwargs.get('model'):
          raise ValueError(
-                "Please provide a list of models, like this: model=['j2-grande-instruct', 'claude-v1', 'gpt-3.5-turbo']"
+                "Please provide a list of models, like this: model=['j2-grande-instruct', 'claude-3-haiku-20240307', 'gpt-3.5-turbo']"
             )
     return LLMS(*args, **kwargs)
\ No newline at end of file
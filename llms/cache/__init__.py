@@ -0,0 +1 @@
+from .response_cache import ResponseCache, cache_result
@@ -0,0 +1,182 @@
+import copy
+import functools
+import hashlib
+import inspect
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+import orjson
+
+if TYPE_CHECKING:
+    from ..results.result import Result
+
+
+class ResponseCache:
+    """LRU cache of completion results for a provider.
+
+    A call is an exact hit when the model and every argument match a cached one.
+    With `semantic_model` set, a miss falls back to the cached call whose prompt
+    embedding is the most similar, provided all other arguments are identical and
+    the cosine similarity reaches `similarity_threshold`.
+    Semantic caching needs `sentence-transformers`.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        semantic_model: Optional[str] = None,
+        similarity_threshold: float = 0.9,
+    ):
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self._results: "OrderedDict[str, Result]" = OrderedDict()
+        # context key -> {exact key: prompt embedding}, for the semantic lookup
+        self._embeddings: Dict[str, Dict] = {}
+        self._contexts: Dict[str, str] = {}
+
+        self._encoder = None
+        if semantic_model is not None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                raise ImportError(
+                    "Semantic caching requires sentence-transformers, "
+                    "install it with `pip install pyllms[semantic_cache]`"
+                ) from None
+            self._encoder = SentenceTransformer(semantic_model)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @staticmethod
+    def _hash(data: Dict) -> str:
+        # computed on every call, even on a hit, so it must stay cheap
+        encoded = orjson.dumps(
+            data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str
+        )
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    def _embed(self, prompt: str):
+        return self._encoder.encode(prompt, normalize_embeddings=True)
+
+    def get(self, model: str, prompt: str, arguments: Dict) -> Tuple[Optional["Result"], str, Any]:
+        """Return the cached result, how it was found (exact, semantic or miss) and the
+        prompt embedding if one was computed, to be passed on to `set` after a miss.
+        """
+        key = self._hash({"model": model, "prompt": prompt, **arguments})
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key], "exact", None
+
+        embedding = None
+        if self._encoder is not None:
+            bucket = self._embeddings.get(self._hash({"model": model, **arguments}))
+            if bucket:
+                import numpy as np
+
+                keys = list(bucket)
+                embedding = self._embed(prompt)
+                similarities = np.stack([bucket[k] for k in keys]) @ embedding
+                best = int(similarities.argmax())
+                if similarities[best] >= self.similarity_threshold:
+                    self._results.move_to_end(keys[best])
+                    return self._results[keys[best]], "semantic", embedding
+
+        return None, "miss", embedding
+
+    def set(
+        self, model: str, prompt: str, arguments: Dict, result: "Result", embedding: Any = None
+    ) -> None:
+        key = self._hash({"model": model, "prompt": prompt, **arguments})
+        self._results[key] = result
+        self._results.move_to_end(key)
+
+        if self._encoder is not None:
+            context = self._hash({"model": model, **arguments})
+            if embedding is None:
+                embedding = self._embed(prompt)
+            self._embeddings.setdefault(context, {})[key] = embedding
+            self._contexts[key] = context
+
+        while len(self._results) > self.max_size:
+            evicted, _ = self._results.popitem(last=False)
+            context = self._contexts.pop(evicted, None)
+            if context is not None:
+                bucket = self._embeddings[context]
+                del bucket[evicted]
+                if not bucket:
+                    del self._embeddings[context]
+
+    def clear(self) -> None:
+        self._results.clear()
+        self._embeddings.clear()
+        self._contexts.clear()
+
+
+def _from_cache(
+    result: "Result", cache_status: str, lookup_latency: Optional[float] = None
+) -> "Result":
+    # copy so the label, and Result.to_json popping model_inputs keys, do not leak
+    # into the stored result
+    cached = copy.copy(result)
+    cached._meta = {**result._meta, "cache": cache_status}
+    cached.model_inputs = dict(result.model_inputs)
+    if cache_status != "miss":
+        # a hit costs nothing and takes the lookup time, the original call's numbers
+        # are kept apart so totals do not count it twice
+        cached._meta.update(
+            cost=0,
+            latency=lookup_latency,
+            cached_cost=result.cost,
+            cached_latency=result._meta.get("latency"),
+        )
+    return cached
+
+
+def cache_result(method: Callable) -> Callable:
+    """Serve `complete`/`acomplete` from the provider's `cache`, when one is set."""
+    signature = inspect.signature(method)
+
+    def _arguments(self, args, kwargs) -> Tuple[str, Dict]:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        del arguments["self"]
+        return arguments.pop("prompt"), arguments
+
+    if inspect.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            if self.cache is None:
+                return await method(self, *args, **kwargs)
+
+            prompt, arguments = _arguments(self, args, kwargs)
+            start = time.perf_counter()
+            result, cache_status, embedding = self.cache.get(self.model, prompt, arguments)
+            if result is not None:
+                return _from_cache(result, cache_status, time.perf_counter() - start)
+
+            result = await method(self, *args, **kwargs)
+            self.cache.set(self.model, prompt, arguments, result, embedding)
+            return _from_cache(result, cache_status)
+
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.cache is None:
+            return method(self, *args, **kwargs)
+
+        prompt, arguments = _arguments(self, args, kwargs)
+        start = time.perf_counter()
+        result, cache_status, embedding = self.cache.get(self.model, prompt, arguments)
+        if result is not None:
+            return _from_cache(result, cache_status, time.perf_counter() - start)
+
+        result = method(self, *args, **kwargs)
+        self.cache.set(self.model, prompt, arguments, result, embedding)
+        return _from_cache(result, cache_status)
+
+    return wrapper
@@ -16,7 +16,7 @@ class AI21Provider(BaseProvider):
     def __init__(self, api_key, model=None):
         ai21.api_key = api_key
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
         self.model = model
 
     def _prepare_model_inputs(
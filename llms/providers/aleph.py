@@ -2,7 +2,6 @@
 
 import os
 
-import tiktoken
 from aleph_alpha_client import AsyncClient, Client, CompletionRequest, Prompt
 
 from ..results.result import Result
@@ -28,10 +27,12 @@ class AlephAlphaProvider(BaseProvider):
         self.async_client = AsyncClient(api_key)
 
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
         self.model = model
 
     def count_tokens(self, content: str):
+        import tiktoken
+
         enc = tiktoken.encoding_for_model("gpt-3.5-turbo")
         return len(enc.encode(content))
 
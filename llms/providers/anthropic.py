@@ -2,38 +2,71 @@
 
 from typing import AsyncGenerator, Dict, Generator, List, Optional, Union
 
-import anthropic
+import httpx
 
+from ..cache.response_cache import ResponseCache, cache_result
 from ..results.result import AsyncStreamResult, Result, StreamResult
 from .base_provider import BaseProvider
 
+# one keep-alive pool per client, so sequential calls skip the TCP/TLS handshake
+HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=20, max_connections=100, keepalive_expiry=60
+)
+# matches the SDK default, long completions can take minutes to return
+HTTP_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+_ROLES = frozenset(("user", "assistant"))
+
 
 class AnthropicProvider(BaseProvider):
+    # cost is per million tokens, all of these models support the Messages API and prompt caching,
+    # cache writes are billed at 1.25x the prompt rate and cache reads at 0.1x
     MODEL_INFO = {
-        "claude-instant-v1.1": {
-            "prompt": 1.63,
-            "completion": 5.51,
-            "token_limit": 9000,
+        "claude-3-haiku-20240307": {
+            "prompt": 0.25,
+            "prompt_cache_write": 0.30,
+            "prompt_cache_read": 0.03,
+            "completion": 1.25,
+            "token_limit": 200_000,
+        },
+        "claude-3-5-haiku-20241022": {
+            "prompt": 0.80,
+            "prompt_cache_write": 1.00,
+            "prompt_cache_read": 0.08,
+            "completion": 4.00,
+            "token_limit": 200_000,
         },
-        "claude-instant-v1": {"prompt": 1.63, "completion": 5.51, "token_limit": 9000},
-        "claude-v1": {"prompt": 11.02, "completion": 32.68, "token_limit": 9000},
-        "claude-v1-100k": {
-            "prompt": 11.02,
-            "completion": 32.68,
-            "token_limit": 100_000,
+        "claude-3-5-sonnet-20241022": {
+            "prompt": 3.00,
+            "prompt_cache_write": 3.75,
+            "prompt_cache_read": 0.30,
+            "completion": 15.00,
+            "token_limit": 200_000,
         },
-        "claude-instant-1": {
-            "prompt": 1.63,
-            "completion": 5.51,
-            "token_limit": 100_000,
+        "claude-3-7-sonnet-20250219": {
+            "prompt": 3.00,
+            "prompt_cache_write": 3.75,
+            "prompt_cache_read": 0.30,
+            "completion": 15.00,
+            "token_limit": 200_000,
         },
-         "claude-instant-1.2": {
-            "prompt": 1.63,
-            "completion": 5.51,
-            "token_limit": 100_000,
+        "claude-3-opus-20240229": {
+            "prompt": 15.00,
+            "prompt_cache_write": 18.75,
+            "prompt_cache_read": 1.50,
+            "completion": 75.00,
+            "token_limit": 200_000,
         },
-        "claude-2": {"prompt": 8.00, "completion": 24.00, "token_limit": 200_000},
     }
+    # shorter prompts are not cached by the API, marking them only adds noise
+    PROMPT_CACHE_MIN_TOKENS = 1024
+    # the API accepts at most this many cache_control blocks per request
+    PROMPT_CACHE_MAX_BREAKPOINTS = 4
+    # rough average for English text, used where a token estimate is good enough
+    CHARS_PER_TOKEN = 4
+    # (system message, stripped text, cacheable) for the last system message seen, kept in
+    # one attribute so concurrent calls never pair a message with another one's preparation
+    _last_system = None
 
     def __init__(
         self,
@@ -41,20 +74,59 @@ class AnthropicProvider(BaseProvider):
         model: Union[str, None] = None,
         client_kwargs: Union[dict, None] = None,
         async_client_kwargs: Union[dict, None] = None,
+        cache: Union[ResponseCache, None] = None,
     ):
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
         self.model = model
+        self.cache = cache
 
         if client_kwargs is None:
             client_kwargs = {}
-        self.client = anthropic.Anthropic(api_key=api_key, **client_kwargs)
+        self.client = self._shared_client(self._make_client, api_key, client_kwargs)
         if async_client_kwargs is None:
             async_client_kwargs = {}
-        self.async_client = anthropic.AsyncAnthropic(api_key=api_key, **async_client_kwargs)
+        self.async_client = self._make_async_client(api_key, async_client_kwargs)
+
+    @staticmethod
+    def _make_client(api_key: Union[str, None], client_kwargs: dict):
+        # imported on first use, so the other providers do not pay for the SDK
+        import anthropic
+
+        if "http_client" not in client_kwargs:
+            client_kwargs = {
+                **client_kwargs,
+                "http_client": httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT),
+            }
+        return anthropic.Anthropic(api_key=api_key, **client_kwargs)
+
+    @staticmethod
+    def _make_async_client(api_key: Union[str, None], client_kwargs: dict):
+        import anthropic
+
+        if "http_client" not in client_kwargs:
+            client_kwargs = {
+                **client_kwargs,
+                "http_client": httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT),
+            }
+        return anthropic.AsyncAnthropic(api_key=api_key, **client_kwargs)
+
+    def _get_tokenizer_client(self):
+        return self.client
+
+    def count_tokens(self, content: Union[str, List[dict]]) -> int:
+        if isinstance(content, list):
+            # messages in Messages API format, only the text blocks are counted
+            content = "".join(
+                block["text"] for message in content for block in message["content"]
+            )
+        import anthropic
 
-    def count_tokens(self, content: str) -> int:
-        return self.client.count_tokens(content)
+        # the legacy tokenizer was removed in SDK 0.39, completions report exact usage
+        # and only stream results count tokens here, so an estimate is good enough
+        if not hasattr(anthropic.Anthropic, "count_tokens"):
+            return -(-len(content) // self.CHARS_PER_TOKEN)
+        return self._get_tokenizer_client().count_tokens(content)
 
     def _prepare_model_inputs(
         self,
@@ -66,53 +138,129 @@ class AnthropicProvider(BaseProvider):
         ai_prompt: str = "",
         system_message: Union[str, None] = None,
         stream: bool = False,
+        cache_breakpoints: Optional[List[int]] = None,
         **kwargs,
     ) -> Dict:
-        if system_message is None:
-            system_prompts = ""
-        else:
-            if self.model != "claude-2":
-                raise ValueError("System message only available for Claude-2 model")
-            system_prompts = f"{system_message.rstrip()}\n\n"
-
-        formatted_prompt = (
-            f"{system_prompts}{anthropic.HUMAN_PROMPT}{prompt}{anthropic.AI_PROMPT}{ai_prompt}"
-        )
-
-        if history is not None:
-            history_text_list = []
-            for message in history:
-                role = message["role"]
-                content = message["content"]
-                if role == "user":
-                    role_prompt = anthropic.HUMAN_PROMPT
-                elif role == "assistant":
-                    role_prompt = anthropic.AI_PROMPT
-                else:
+        if cache_breakpoints:
+            if not history:
+                raise ValueError("cache_breakpoints require a non-empty history.")
+            for index in cache_breakpoints:
+                if not -len(history) <= index < len(history):
                     raise ValueError(
-                        f"Invalid role {role}, role must be user or assistant."
+                        f"Invalid cache breakpoint {index}, history has {len(history)} messages."
                     )
 
-                formatted_message = f"{role_prompt}{content}"
-                history_text_list.append(formatted_message)
+        # the prefill becomes a final assistant turn, which the API rejects if it ends in whitespace
+        ai_prompt = ai_prompt.rstrip()
+
+        # one-shot completion, the common case, skips the history handling
+        if history is None and not ai_prompt:
+            messages = [{"role": "user", "content": [{"type": "text", "text": prompt}]}]
+        else:
+            messages = []
+            if history is not None:
+                for message in history:
+                    role = message["role"]
+                    if role not in _ROLES:
+                        raise ValueError(
+                            f"Invalid role {role}, role must be user or assistant."
+                        )
+                    messages.append(
+                        {"role": role, "content": [{"type": "text", "text": message["content"]}]}
+                    )
 
-            history_prompt = "".join(history_text_list)
-            formatted_prompt = f"{history_prompt}{formatted_prompt}"
+                for index in cache_breakpoints or ():
+                    messages[index]["content"][-1]["cache_control"] = {"type": "ephemeral"}
 
-        max_tokens_to_sample = kwargs.pop("max_tokens_to_sample", max_tokens)
+            messages.append({"role": "user", "content": [{"type": "text", "text": prompt}]})
+            if ai_prompt:
+                messages.append(
+                    {"role": "assistant", "content": [{"type": "text", "text": ai_prompt}]}
+                )
 
-        if stop_sequences is None:
-            stop_sequences = [anthropic.HUMAN_PROMPT]
         model_inputs = {
-            "prompt": formatted_prompt,
+            "messages": messages,
             "temperature": temperature,
-            "max_tokens_to_sample": max_tokens_to_sample,
-            "stop_sequences": stop_sequences,
+            "max_tokens": max_tokens,
             "stream": stream,
-            **kwargs,
         }
+        if kwargs:
+            model_inputs.update(kwargs)
+            # legacy name of max_tokens in the completions API
+            if "max_tokens_to_sample" in kwargs:
+                model_inputs["max_tokens"] = model_inputs.pop("max_tokens_to_sample")
+
+        if stop_sequences is not None:
+            model_inputs["stop_sequences"] = stop_sequences
+
+        if system_message is not None:
+            # a session resends the same system message, strip and count it only once
+            last = self._last_system
+            if last is None or last[0] is not system_message:
+                # estimated from the length, the request path must not depend on a tokenizer
+                cacheable = (
+                    len(system_message) >= self.PROMPT_CACHE_MIN_TOKENS * self.CHARS_PER_TOKEN
+                )
+                last = (system_message, system_message.rstrip(), cacheable)
+                self._last_system = last
+
+            _, text, cacheable = last
+            system_prompt = {"type": "text", "text": text}
+            if cacheable:
+                system_prompt["cache_control"] = {"type": "ephemeral"}
+            model_inputs["system"] = [system_prompt]
+        else:
+            cacheable = False
+
+        if cache_breakpoints:
+            breakpoints = len({index % len(history) for index in cache_breakpoints}) + cacheable
+            if breakpoints > self.PROMPT_CACHE_MAX_BREAKPOINTS:
+                raise ValueError(
+                    f"Too many cache breakpoints, at most {self.PROMPT_CACHE_MAX_BREAKPOINTS} "
+                    "are allowed per request, including the one on a long system message."
+                )
+
         return model_inputs
 
+    def _usage_meta(self, usage) -> Dict:
+        # with prompt caching, input_tokens only counts the uncached part of the prompt
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        tokens_prompt = usage.input_tokens + cache_read + cache_write
+        return {
+            "tokens_prompt": tokens_prompt,
+            "tokens_prompt_cache_read": cache_read,
+            "tokens_prompt_cache_write": cache_write,
+            "tokens_completion": usage.output_tokens,
+            "latency": self.latency,
+            # Result.cost only passes prompt and completion tokens, price the cache here
+            "cost": self.compute_cost(
+                prompt_tokens=tokens_prompt,
+                completion_tokens=usage.output_tokens,
+                cache_read_tokens=cache_read,
+                cache_write_tokens=cache_write,
+            ),
+        }
+
+    def compute_cost(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+    ) -> float:
+        # prompt_tokens includes the cached part, which is billed at its own rates
+        cost_per_token = self.MODEL_INFO[self.model]
+        cost = (
+            ((prompt_tokens - cache_read_tokens - cache_write_tokens) * cost_per_token["prompt"])
+            + (cache_read_tokens * cost_per_token["prompt_cache_read"])
+            + (cache_write_tokens * cost_per_token["prompt_cache_write"])
+            + (completion_tokens * cost_per_token["completion"])
+        ) / 1_000_000
+        cost = round(cost, 5)
+        return cost
+
+    @cache_result
     def complete(
         self,
         prompt: str,
@@ -122,6 +270,7 @@ class AnthropicProvider(BaseProvider):
         stop_sequences: Optional[List[str]] = None,
         ai_prompt: str = "",
         system_message: Union[str, None] = None,
+        cache_breakpoints: Optional[List[int]] = None,
         **kwargs,
     ) -> Result:
         """
@@ -129,6 +278,10 @@ class AnthropicProvider(BaseProvider):
             history: messages in OpenAI format,
               each dict must include role and content key.
             ai_prompt: prefix of AI response, for finer control on the output.
+              Trailing whitespace is stripped, the API does not accept it.
+            cache_breakpoints: indices of history messages to mark as prompt cache
+              breakpoints, everything up to and including them is cached. At most 4,
+              counting the one set on a long system message.
         """
 
         model_inputs = self._prepare_model_inputs(
@@ -139,21 +292,23 @@ class AnthropicProvider(BaseProvider):
             stop_sequences=stop_sequences,
             ai_prompt=ai_prompt,
             system_message=system_message,
+            cache_breakpoints=cache_breakpoints,
             **kwargs,
         )
 
         with self.track_latency():
-            response = self.client.completions.create(model=self.model, **model_inputs)
+            response = self.client.messages.create(model=self.model, **model_inputs)
 
-        completion = response.completion.strip()
+        completion = "".join(block.text for block in response.content).strip()
 
         return Result(
             text=completion,
             model_inputs=model_inputs,
             provider=self,
-            meta={"latency": self.latency},
+            meta=self._usage_meta(response.usage),
         )
 
+    @cache_result
     async def acomplete(
         self,
         prompt: str,
@@ -163,6 +318,7 @@ class AnthropicProvider(BaseProvider):
         stop_sequences: Optional[List[str]] = None,
         ai_prompt: str = "",
         system_message: Union[str, None] = None,
+        cache_breakpoints: Optional[List[int]] = None,
         **kwargs,
     ):
         """
@@ -170,6 +326,10 @@ class AnthropicProvider(BaseProvider):
             history: messages in OpenAI format,
               each dict must include role and content key.
             ai_prompt: prefix of AI response, for finer control on the output.
+              Trailing whitespace is stripped, the API does not accept it.
+            cache_breakpoints: indices of history messages to mark as prompt cache
+              breakpoints, everything up to and including them is cached. At most 4,
+              counting the one set on a long system message.
         """
         model_inputs = self._prepare_model_inputs(
             prompt=prompt,
@@ -179,19 +339,20 @@ class AnthropicProvider(BaseProvider):
             stop_sequences=stop_sequences,
             ai_prompt=ai_prompt,
             system_message=system_message,
+            cache_breakpoints=cache_breakpoints,
             **kwargs,
         )
         with self.track_latency():
-            response = await self.async_client.completions.create(
+            response = await self.async_client.messages.create(
                 model=self.model, **model_inputs
             )
-        completion = response.completion.strip()
+        completion = "".join(block.text for block in response.content).strip()
 
         return Result(
             text=completion,
             model_inputs=model_inputs,
             provider=self,
-            meta={"latency": self.latency},
+            meta=self._usage_meta(response.usage),
         )
 
     def complete_stream(
@@ -203,6 +364,7 @@ class AnthropicProvider(BaseProvider):
         stop_sequences: Optional[List[str]] = None,
         ai_prompt: str = "",
         system_message: Union[str, None] = None,
+        cache_breakpoints: Optional[List[int]] = None,
         **kwargs,
     ) -> StreamResult:
         """
@@ -210,6 +372,10 @@ class AnthropicProvider(BaseProvider):
             history: messages in OpenAI format,
               each dict must include role and content key.
             ai_prompt: prefix of AI response, for finer control on the output.
+              Trailing whitespace is stripped, the API does not accept it.
+            cache_breakpoints: indices of history messages to mark as prompt cache
+              breakpoints, everything up to and including them is cached. At most 4,
+              counting the one set on a long system message.
         """
         model_inputs = self._prepare_model_inputs(
             prompt=prompt,
@@ -219,20 +385,27 @@ class AnthropicProvider(BaseProvider):
             stop_sequences=stop_sequences,
             ai_prompt=ai_prompt,
             system_message=system_message,
+            cache_breakpoints=cache_breakpoints,
             stream=True,
             **kwargs,
         )
-        response = self.client.completions.create(model=self.model, **model_inputs)
+        response = self.client.messages.create(model=self.model, **model_inputs)
         stream = self._process_stream(response)
 
         return StreamResult(stream=stream, model_inputs=model_inputs, provider=self)
 
     def _process_stream(self, response: Generator) -> Generator:
-        first_completion = next(response).completion
-        yield first_completion.lstrip()
-
-        for data in response:
-            yield data.completion
+        stripped = False
+        for event in response:
+            if event.type != "content_block_delta":
+                continue
+            completion = event.delta.text
+            if not stripped:
+                completion = completion.lstrip()
+                if not completion:
+                    continue
+                stripped = True
+            yield completion
 
     async def acomplete_stream(
         self,
@@ -243,6 +416,7 @@ class AnthropicProvider(BaseProvider):
         stop_sequences: Optional[List[str]] = None,
         ai_prompt: str = "",
         system_message: Union[str, None] = None,
+        cache_breakpoints: Optional[List[int]] = None,
         **kwargs,
     ) -> AsyncStreamResult:
         """
@@ -250,6 +424,10 @@ class AnthropicProvider(BaseProvider):
             history: messages in OpenAI format,
               each dict must include role and content key.
             ai_prompt: prefix of AI response, for finer control on the output.
+              Trailing whitespace is stripped, the API does not accept it.
+            cache_breakpoints: indices of history messages to mark as prompt cache
+              breakpoints, everything up to and including them is cached. At most 4,
+              counting the one set on a long system message.
         """
         model_inputs = self._prepare_model_inputs(
             prompt=prompt,
@@ -259,11 +437,12 @@ class AnthropicProvider(BaseProvider):
             stop_sequences=stop_sequences,
             ai_prompt=ai_prompt,
             system_message=system_message,
+            cache_breakpoints=cache_breakpoints,
             stream=True,
             **kwargs,
         )
 
-        response = await self.async_client.completions.create(
+        response = await self.async_client.messages.create(
             model=self.model, **model_inputs
         )
 
@@ -274,8 +453,14 @@ class AnthropicProvider(BaseProvider):
         )
 
     async def _aprocess_stream(self, response: AsyncGenerator) -> AsyncGenerator:
-        first_completion = (await response.__anext__()).completion
-        yield first_completion.lstrip()
-
-        async for data in response:
-            yield data.completion
+        stripped = False
+        async for event in response:
+            if event.type != "content_block_delta":
+                continue
+            completion = event.delta.text
+            if not stripped:
+                completion = completion.lstrip()
+                if not completion:
+                    continue
+                stripped = True
+            yield completion
@@ -1,6 +1,7 @@
+import asyncio
 import time
 from contextlib import contextmanager
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 
 
 class BaseProvider:
@@ -9,6 +10,10 @@ class BaseProvider:
     """
 
     MODEL_INFO = {}
+    # optional ResponseCache, consulted by complete/acomplete where supported
+    cache = None
+    # SDK clients shared by providers created with the same settings
+    _shared_clients: Dict = {}
 
     def __init__(self, model=None, api_key=None, **kwargs):
         self.latency = None
@@ -27,6 +32,42 @@ class BaseProvider:
     ) -> Dict:
         raise NotImplementedError()
 
+    @staticmethod
+    def _shared_client(factory: Callable, api_key: Optional[str], client_kwargs: Dict):
+        """Return `factory(api_key, client_kwargs)`, built once per factory, key and kwargs.
+
+        Providers created per request then reuse one client and its connection pool.
+        Only for sync clients: async connection pools are bound to the event loop
+        that opened them, and would break under a later `asyncio.run`.
+        """
+        try:
+            key = (factory, api_key, frozenset(client_kwargs.items()))
+            client = BaseProvider._shared_clients.get(key)
+        except TypeError:
+            # unhashable kwargs, e.g. a default_headers dict, get a client of their own
+            return factory(api_key, client_kwargs)
+        if client is None:
+            client = BaseProvider._shared_clients[key] = factory(api_key, client_kwargs)
+        return client
+
+    @staticmethod
+    def close_shared_clients():
+        """Close the connection pools of the shared SDK clients.
+
+        Providers created afterwards get new clients. Providers created before keep
+        the closed ones and must not be used anymore. An `http_client` passed in
+        `client_kwargs` belongs to the caller and is left open.
+        """
+        shared = list(BaseProvider._shared_clients.items())
+        BaseProvider._shared_clients.clear()
+        for (_, _, client_kwargs), client in shared:
+            if any(name == "http_client" for name, _ in client_kwargs):
+                continue
+            # the Mistral client has no close(), it closes its pool on garbage collection
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+
     @contextmanager
     def track_latency(self):
         start = time.perf_counter()
@@ -57,6 +98,46 @@ class BaseProvider:
             f"Async complete is not yet supported with {self.__name__}"
         )
 
+    async def acomplete_many(
+        self,
+        prompts: List[str],
+        max_concurrency: int = 10,
+        rate_limit_rpm: Optional[int] = None,
+        **kwargs,
+    ) -> List:
+        """Complete many prompts concurrently with `acomplete`.
+
+        Args:
+            max_concurrency: maximum number of requests in flight.
+            rate_limit_rpm: if set, requests are started at most this many per minute.
+            kwargs: passed to `acomplete` for every prompt.
+
+        Returns:
+            results in the order of `prompts`, a failed prompt gives its exception.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        rate_lock = asyncio.Lock()
+        next_start = 0.0
+
+        async def _wait_for_rate_limit():
+            nonlocal next_start
+            # reserve the next free start slot, then sleep outside of the lock
+            async with rate_lock:
+                now = time.monotonic()
+                start = max(now, next_start)
+                next_start = start + 60 / rate_limit_rpm
+            await asyncio.sleep(start - now)
+
+        async def _complete(prompt):
+            async with semaphore:
+                if rate_limit_rpm:
+                    await _wait_for_rate_limit()
+                return await self.acomplete(prompt, **kwargs)
+
+        return await asyncio.gather(
+            *(_complete(prompt) for prompt in prompts), return_exceptions=True
+        )
+
     def complete_stream(self):
         raise NotImplementedError(
             f"Streaming is not yet supported with {self.__name__}"
@@ -3,20 +3,49 @@
 import os
 from typing import Union
 
-import anthropic_bedrock
+import httpx
 
-from .anthropic import AnthropicProvider
+from ..cache.response_cache import ResponseCache
+from .anthropic import HTTP_LIMITS, HTTP_TIMEOUT, AnthropicProvider
 
 
 class BedrockAnthropicProvider(AnthropicProvider):
     MODEL_INFO = {
-        "anthropic.claude-instant-v1": {"prompt": 1.63, "completion": 5.51, "token_limit": 9000},
-        "anthropic.claude-v1": {
-            "prompt": 11.02,
-            "completion": 32.68,
-            "token_limit": 100_000,
+        "anthropic.claude-3-haiku-20240307-v1:0": {
+            "prompt": 0.25,
+            "prompt_cache_write": 0.30,
+            "prompt_cache_read": 0.03,
+            "completion": 1.25,
+            "token_limit": 200_000,
+        },
+        "anthropic.claude-3-5-haiku-20241022-v1:0": {
+            "prompt": 0.80,
+            "prompt_cache_write": 1.00,
+            "prompt_cache_read": 0.08,
+            "completion": 4.00,
+            "token_limit": 200_000,
+        },
+        "anthropic.claude-3-5-sonnet-20241022-v2:0": {
+            "prompt": 3.00,
+            "prompt_cache_write": 3.75,
+            "prompt_cache_read": 0.30,
+            "completion": 15.00,
+            "token_limit": 200_000,
+        },
+        "anthropic.claude-3-7-sonnet-20250219-v1:0": {
+            "prompt": 3.00,
+            "prompt_cache_write": 3.75,
+            "prompt_cache_read": 0.30,
+            "completion": 15.00,
+            "token_limit": 200_000,
+        },
+        "anthropic.claude-3-opus-20240229-v1:0": {
+            "prompt": 15.00,
+            "prompt_cache_write": 18.75,
+            "prompt_cache_read": 1.50,
+            "completion": 75.00,
+            "token_limit": 200_000,
         },
-        "anthropic.claude-v2": {"prompt": 11.02, "completion": 32.68, "token_limit": 100_000},
     }
 
     def __init__(
@@ -27,10 +56,14 @@ class BedrockAnthropicProvider(AnthropicProvider):
         aws_region: Union[str, None] = None,
         client_kwargs: Union[dict, None] = None,
         async_client_kwargs: Union[dict, None] = None,
+        cache: Union[ResponseCache, None] = None,
     ):
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
         self.model = model
+        self.cache = cache
+
+        import anthropic
 
         if aws_access_key is None:
             aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
@@ -39,7 +72,13 @@ class BedrockAnthropicProvider(AnthropicProvider):
 
         if client_kwargs is None:
             client_kwargs = {}
-        self.client = anthropic_bedrock.AnthropicBedrock(
+        # older SDKs build their own httpx client with proxies=, which httpx 0.28 rejects
+        if "http_client" not in client_kwargs:
+            client_kwargs = {
+                **client_kwargs,
+                "http_client": httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT),
+            }
+        self.client = anthropic.AnthropicBedrock(
             aws_access_key=aws_access_key,
             aws_secret_key=aws_secret_key,
             aws_region=aws_region,
@@ -48,9 +87,18 @@ class BedrockAnthropicProvider(AnthropicProvider):
 
         if async_client_kwargs is None:
             async_client_kwargs = {}
-        self.async_client = anthropic_bedrock.AsyncAnthropicBedrock(
+        if "http_client" not in async_client_kwargs:
+            async_client_kwargs = {
+                **async_client_kwargs,
+                "http_client": httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT),
+            }
+        self.async_client = anthropic.AsyncAnthropicBedrock(
             aws_access_key=aws_access_key,
             aws_secret_key=aws_secret_key,
             aws_region=aws_region,
             **async_client_kwargs,
         )
+
+    def _get_tokenizer_client(self):
+        # the Bedrock clients do not ship the tokenizer, the first-party one does
+        return self._shared_client(self._make_client, None, {})
@@ -26,7 +26,7 @@ class CohereProvider(BaseProvider):
         self.async_client = cohere.AsyncClient(api_key)
 
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
         self.model = model
 
     def count_tokens(self, content: str) -> int:
@@ -26,7 +26,7 @@ class GoogleProvider(BaseProvider):
     
     def __init__(self, model=None, **kwargs):
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
 
         self.model = model
         if model.startswith('text-'):
@@ -20,7 +20,7 @@ class GoogleGenAIProvider(BaseProvider):
     
     def __init__(self, api_key=None, model=None, **kwargs):
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
 
         if api_key is None:
             api_key = os.getenv("GOOGLE_API_KEY")
@@ -68,7 +68,7 @@ class HuggingfaceHubProvider(BaseProvider):
 
     def __init__(self, api_key=None, model=None):
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
 
         self.model = model
 
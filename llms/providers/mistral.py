@@ -1,11 +1,7 @@
-import tiktoken
+from collections import OrderedDict
 from typing import Dict, Union, Optional, List, Generator, AsyncGenerator
-from mistralai.client import MistralClient
-from mistralai.async_client import MistralAsyncClient
-from mistralai.models.chat_completion import ChatMessage
-
-
 
+from ..cache.response_cache import ResponseCache, cache_result
 from ..results.result import AsyncStreamResult, Result, StreamResult
 from .base_provider import BaseProvider
 
@@ -16,6 +12,8 @@ class MistralProvider(BaseProvider):
         "mistral-small": {"prompt": 0.6, "completion": 1.8, "token_limit": 32_000},
         "mistral-medium": {"prompt": 2.5, "completion": 7.5, "token_limit": 32_000},
     }
+    # chat sessions resend the same turns, their ChatMessage objects are reused
+    MESSAGE_CACHE_SIZE = 1024
 
     def __init__(
         self,
@@ -23,24 +21,45 @@ class MistralProvider(BaseProvider):
         model: Union[str, None] = None,
         client_kwargs: Union[dict, None] = None,
         async_client_kwargs: Union[dict, None] = None,
+        cache: Union[ResponseCache, None] = None,
     ):
 
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
         self.model = model
+        self.cache = cache
 
         if client_kwargs is None:
             client_kwargs = {}
-        self.client = MistralClient(api_key=api_key, **client_kwargs)
+        self.client = self._shared_client(self._make_client, api_key, client_kwargs)
 
         if async_client_kwargs is None:
             async_client_kwargs = {}
-        self.async_client = MistralAsyncClient(api_key=api_key, **async_client_kwargs)
+        self.async_client = self._make_async_client(api_key, async_client_kwargs)
+        self._enc = None
+        self._message_cache = OrderedDict()
+
+    @staticmethod
+    def _make_client(api_key: Union[str, None], client_kwargs: dict):
+        # SDKs are imported on first use, so the other providers do not pay for them
+        from mistralai.client import MistralClient
+
+        return MistralClient(api_key=api_key, **client_kwargs)
+
+    @staticmethod
+    def _make_async_client(api_key: Union[str, None], client_kwargs: dict):
+        from mistralai.async_client import MistralAsyncClient
+
+        return MistralAsyncClient(api_key=api_key, **client_kwargs)
 
     def count_tokens(self, content: Union[str, List[dict]]) -> int:
-        # TODO: update after Mistarl support count token in their SDK
-        # use gpt 3.5 turbo for estimation now
-        enc = tiktoken.encoding_for_model(self.model)
+        if self._enc is None:
+            import tiktoken
+
+            # TODO: update after Mistarl support count token in their SDK
+            # use gpt 3.5 turbo for estimation now
+            self._enc = tiktoken.encoding_for_model("gpt-3.5-turbo")
+
         if isinstance(content, list):
             # When field name is present, ChatGPT will ignore the role token.
             # Adopted from OpenAI cookbook
@@ -50,17 +69,36 @@ class MistralProvider(BaseProvider):
 
             messages = content
             messages_text = ["".join(message.values()) for message in messages]
-            tokens = [enc.encode(t, disallowed_special=()) for t in messages_text]
-
-            n_tokens_list = []
-            for token, message in zip(tokens, messages):
-                n_tokens = len(token) + formatting_token_count
-                if "name" in message:
-                    n_tokens += -1
-                n_tokens_list.append(n_tokens)
-            return sum(n_tokens_list)
+            tokens = self._enc.encode_batch(messages_text, disallowed_special=())
+
+            n_tokens = sum(map(len, tokens)) + formatting_token_count * len(tokens)
+            n_names = sum("name" in message for message in messages)
+            return n_tokens - n_names
         else:
-            return len(enc.encode(content, disallowed_special=()))
+            return len(self._enc.encode(content, disallowed_special=()))
+
+    def _chat_message(self, role: str, content: str):
+        key = (role, content)
+        try:
+            message = self._message_cache[key]
+            self._message_cache.move_to_end(key)
+        except KeyError:
+            # a miss, or evicted by a concurrent call, e.g. in LLMS.benchmark, in between
+            from mistralai.models.chat_completion import ChatMessage
+
+            message = self._message_cache[key] = ChatMessage(role=role, content=content)
+            if len(self._message_cache) > self.MESSAGE_CACHE_SIZE:
+                self._message_cache.popitem(last=False)
+        return message
+
+    def _history_message(self, utterance: dict):
+        # only plain text turns are memoized, anything else is built as given
+        if utterance.keys() == {"role", "content"} and isinstance(utterance["content"], str):
+            return self._chat_message(utterance["role"], utterance["content"])
+
+        from mistralai.models.chat_completion import ChatMessage
+
+        return ChatMessage(**utterance)
 
     def _prepare_model_inputs(
         self,
@@ -77,14 +115,12 @@ class MistralProvider(BaseProvider):
         if stop_sequences:
             raise ValueError("Parameter `stop` is not supported")
 
-        messages = [ChatMessage(role="user", content=prompt)]
+        messages = []
+        if isinstance(system_message, str):
+            messages.append(self._chat_message("system", system_message))
         if history:
-            messages = [ChatMessage(**utterance) for utterance in history] + messages
-
-        if system_message is None:
-            pass
-        elif isinstance(system_message, str):
-            messages = [ChatMessage(role="system", content=system_message), *messages]
+            messages.extend(self._history_message(utterance) for utterance in history)
+        messages.append(self._chat_message("user", prompt))
 
         model_inputs = {
             "messages": messages,
@@ -92,11 +128,13 @@ class MistralProvider(BaseProvider):
             "max_tokens": max_tokens,
             "safe_prompt": safe_prompt,
             "random_seed": random_seed,
-            **kwargs,
         }
+        if kwargs:
+            model_inputs.update(kwargs)
 
         return model_inputs
 
+    @cache_result
     def complete(
         self,
         prompt: str,
@@ -138,6 +176,7 @@ class MistralProvider(BaseProvider):
             meta=meta,
         )
 
+    @cache_result
     async def acomplete(
         self,
         prompt: str,
@@ -207,16 +246,16 @@ class MistralProvider(BaseProvider):
         return StreamResult(stream=stream, model_inputs=model_inputs, provider=self)
 
     def _process_stream(self, response: Generator) -> Generator:
-        chunk_generator = (
-            chunk.choices[0].delta.content for chunk in response
+        # drops the None and empty chunks Mistral sends, mostly at the start
+        chunk_generator = filter(
+            None, (chunk.choices[0].delta.content for chunk in response)
         )
-
-        while not (first_text := next(chunk_generator)):
-            continue
-        yield first_text.lstrip()
-        for chunk in chunk_generator:
-            if chunk is not None:
-                yield chunk
+        for first_completion in chunk_generator:
+            first_completion = first_completion.lstrip()
+            if first_completion:
+                yield first_completion
+                break
+        yield from chunk_generator
 
     async def acomplete_stream(
         self,
@@ -249,13 +288,15 @@ class MistralProvider(BaseProvider):
         )
 
     async def _aprocess_stream(self, response) -> AsyncGenerator:
-        while True:
-            first_completion = (await response.__anext__()).choices[0].delta.content
+        async for chunk in response:
+            first_completion = chunk.choices[0].delta.content
             if first_completion:
-                yield first_completion.lstrip()
-                break
+                first_completion = first_completion.lstrip()
+                if first_completion:
+                    yield first_completion
+                    break
 
         async for chunk in response:
             completion = chunk.choices[0].delta.content
-            if completion is not None:
+            if completion:
                 yield completion
@@ -1,5 +1,4 @@
 from typing import AsyncGenerator, Dict, Generator, List, Optional, Union
-import tiktoken
 
 from openai import AsyncOpenAI, OpenAI
 import json
@@ -26,7 +25,7 @@ class OpenAIProvider(BaseProvider):
         async_client_kwargs: Union[dict, None] = None,
     ):
         if model is None:
-            model = list(self.MODEL_INFO.keys())[0]
+            model = next(iter(self.MODEL_INFO))
         self.model = model
         if client_kwargs is None:
             client_kwargs = {}
@@ -40,6 +39,8 @@ class OpenAIProvider(BaseProvider):
         return self.MODEL_INFO[self.model]['is_chat']
 
     def count_tokens(self, content: Union[str, List[dict]]) -> int:
+        import tiktoken
+
         enc = tiktoken.encoding_for_model(self.model)
         if isinstance(content, list):
             # When field name is present, ChatGPT will ignore the role token.
@@ -46,7 +46,8 @@ class Result:
 
     @property
     def cost(self) -> float:
-        if cost := self._meta.get("cost"):
+        # a cache hit has a cost of 0, which must not be recomputed
+        if (cost := self._meta.get("cost")) is not None:
             return cost
         else:
             cost = self.provider.compute_cost(
@@ -57,7 +58,7 @@ class Result:
 
     @property
     def meta(self) -> Dict:
-        return {
+        meta = {
             "model": self.provider.model,
             "tokens": self.tokens,
             "tokens_prompt": self.tokens_prompt,
@@ -65,6 +66,17 @@ class Result:
             "cost": self.cost,
             "latency": self._meta.get("latency"),
         }
+        # only reported by providers with prompt caching or a response cache
+        for key in (
+            "tokens_prompt_cache_read",
+            "tokens_prompt_cache_write",
+            "cache",
+            "cached_cost",
+            "cached_latency",
+        ):
+            if key in self._meta:
+                meta[key] = self._meta[key]
+        return meta
 
     def to_json(self):
         model_inputs = self.model_inputs
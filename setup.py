@@ -19,21 +19,23 @@ setup(
     install_requires=[
         "openai>=1",
         "tiktoken",
-        "anthropic>=0.3",
-        "anthropic_bedrock",
+        "anthropic[bedrock]>=0.18",
+        "httpx",
         "ai21",
         "cohere",
         "aleph-alpha-client",
         "huggingface_hub",
         "google-cloud-aiplatform",
         "prettytable",
+        "orjson",
         "protobuf~=3.20.3",
         "grpcio~=1.54.2",
         "google-generativeai",
         "mistralai",
     ],
     extras_require={
-        "local": ["einops", "accelerate"]
+        "local": ["einops", "accelerate"],
+        "semantic_cache": ["sentence-transformers"],
     },
     classifiers=[
         "Development Status :: 3 - Alpha",